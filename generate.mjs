@@ -0,0 +1,69 @@
+import readline from 'readline';
+import * as d3 from 'd3';
+import { voronoiTreemap } from 'd3-voronoi-treemap';
+
+function polygonRegular(radius, sides) {
+	const angleStep = 2 * Math.PI / sides;
+	const points = [];
+	for (let i = 0; i < sides; i++) {
+		let angle = i * angleStep;
+		points.push([
+			radius * Math.cos(angle),
+			radius * Math.sin(angle)
+		]);
+	}
+	return points;
+}
+
+function layout(raw) {
+	const nested = d3.group(raw, d => d.Continent);
+
+	const hierarchy = { name: "root", children: [] };
+	for (let [continent, countries] of nested) {
+		hierarchy.children.push({
+			name: continent,
+			children: countries.map(d => ({
+				name: d.Country,
+				value: d.Value
+			}))
+		});
+	}
+
+	const root = d3.hierarchy(hierarchy).sum(d => d.value);
+	const treemap = voronoiTreemap().clip(polygonRegular(1, 360));
+	treemap(root);
+
+	// Polygon vertices go into one flat float64 buffer sent as base64;
+	// offsets[i]..offsets[i + 1] are the vertices of cells[i]
+	const cells = [];
+	const offsets = [0];
+	const flat = [];
+	root.each(d => {
+		if (d.polygon && d.data.name !== "root") {
+			cells.push({
+				name: d.data.name,
+				value: d.value,
+				depth: d.depth,
+				parent: d.parent.data.name
+			});
+			for (const [x, y] of d.polygon) {
+				flat.push(x, y);
+			}
+			offsets.push(flat.length / 2);
+		}
+	});
+	const coords = Buffer.from(new Float64Array(flat).buffer).toString('base64');
+	return { cells, offsets, coords };
+}
+
+// One JSON request per line on stdin, one JSON result per line on stdout
+const lines = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+for await (const line of lines) {
+	if (!line.trim()) continue;
+	try {
+		process.stdout.write(JSON.stringify(layout(JSON.parse(line))) + '\n');
+	} catch (e) {
+		console.error(e);
+		process.exit(1);
+	}
+}
@@ -1,109 +1,168 @@
 import os
-import json
+import orjson
 import subprocess
+import atexit
+import hashlib
 import tempfile
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import numpy as np
-from math import sqrt
-import array
 import base64
-from shapely.geometry import Polygon
-
-def generate_js_script(path_data_json, path_output_json):
-	return f"""
-import fs from 'fs';
-import * as d3 from 'd3';
-import {{ voronoiTreemap }} from 'd3-voronoi-treemap';
-
-function polygonRegular(radius, sides) {{
-	const angleStep = 2 * Math.PI / sides;
-	const points = [];
-	for (let i = 0; i < sides; i++) {{
-		let angle = i * angleStep;
-		points.push([
-			radius * Math.cos(angle),
-			radius * Math.sin(angle)
-		]);
-	}}
-	return points;
-}}
-
-try {{
-	const raw = JSON.parse(fs.readFileSync("{path_data_json}"));
-	const nested = d3.group(raw, d => d.Continent);
-
-	const hierarchy = {{ name: "root", children: [] }};
-	for (let [continent, countries] of nested) {{
-		hierarchy.children.push({{
-			name: continent,
-			children: countries.map(d => ({{
-				name: d.Country,
-				value: d.Value
-			}}))
-		}});
-	}}
-
-	const root = d3.hierarchy(hierarchy).sum(d => d.value);
-	const treemap = voronoiTreemap().clip(polygonRegular(1, 360));
-	treemap(root);
-
-	const out = [];
-	root.each(d => {{
-		if (d.polygon && d.data.name !== "root") {{
-			out.push({{
-				name: d.data.name,
-				value: d.value,
-				depth: d.depth,
-				parent: d.parent.data.name,
-				polygon: d.polygon
-			}});
-		}}
-	}});
-	fs.writeFileSync("{path_output_json}", JSON.stringify(out, null, 2));
-}} catch (e) {{
-	console.error(e);
-	process.exit(1);
-}}
-"""
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# White disc drawn behind each flag
+FLAG_BACKGROUND = "data:image/svg+xml;base64," + base64.b64encode(
+	b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 2 2"><circle cx="1" cy="1" r="1" fill="white"/></svg>'
+).decode('utf-8')
+
+# Cell count above which centroids and areas are computed in parallel, and the
+# number of cells handed to each worker process
+PARALLEL_THRESHOLD = 50000
+PARALLEL_CHUNK = 10000
+
+# Node script computing the treemap layout, shipped next to this file
+JS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generate.mjs")
+
+_worker = None
+
+def stop_worker():
+	global _worker
+	if _worker is not None:
+		_worker.stdin.close()
+		try:
+			_worker.wait(timeout=5)
+		except subprocess.TimeoutExpired:
+			_worker.kill()
+		_worker = None
+
+atexit.register(stop_worker)
+
+def request_worker(payload):
+	# Node is started once and kept alive, so repeated calls skip its startup
+	# and the d3 module load
+	global _worker
+	if _worker is None or _worker.poll() is not None:
+		_worker = subprocess.Popen(
+			["node", JS_PATH],
+			stdin=subprocess.PIPE,
+			stdout=subprocess.PIPE,
+			cwd=os.path.dirname(JS_PATH)
+		)
+
+	_worker.stdin.write(payload + b'\n')
+	_worker.stdin.flush()
+	result = _worker.stdout.readline()
+	if not result:
+		raise RuntimeError("Node worker exited without a result")
+	return result
 
 def run_voronoi_js(df):
-	main_dir = os.path.dirname(os.path.abspath(__file__))
+	payload = orjson.dumps(df[['Continent', 'Country', 'Value']].to_dict(orient='records'))
 
-	with tempfile.TemporaryDirectory() as temp_dir:
-		data_path = os.path.join(temp_dir, "data.json")
-		output_path = os.path.join(temp_dir, "result.json")
+	# Reuse the result of a previous run on the same input and script
+	with open(JS_PATH, 'rb') as f:
+		script = f.read()
+	key = hashlib.blake2b(script + payload).hexdigest()
+	cache_path = os.path.join(tempfile.gettempdir(), f"voronoi_{key}.json")
+	if os.path.exists(cache_path):
+		with open(cache_path, 'rb') as f:
+			return decode_cells(orjson.loads(f.read()))
 
-		# Save JS script to the project root (not temp)
-		js_path = os.path.join(main_dir, "generate.mjs")
+	try:
+		result = request_worker(payload)
+	except (OSError, RuntimeError):
+		# Fall back to a one-shot Node process
+		result = subprocess.run(
+			["node", JS_PATH],
+			input=payload + b'\n',
+			stdout=subprocess.PIPE,
+			check=True,
+			cwd=os.path.dirname(JS_PATH)
+		).stdout
 
-		df[['Continent', 'Country', 'Value']].to_json(data_path, orient='records')
+	# Parse before caching so an invalid result is never stored
+	parsed = orjson.loads(result)
 
-		with open(js_path, 'w') as f:
-			f.write(generate_js_script(data_path, output_path))
+	# Write to a temporary name first so a partial file is never picked up
+	partial_path = f"{cache_path}.{os.getpid()}.tmp"
+	with open(partial_path, 'wb') as f:
+		f.write(result)
+	os.replace(partial_path, cache_path)
 
-		try:
-			subprocess.run(["node", js_path], check=True, cwd=main_dir)
-		finally:
-			# Clean up JS file afterward
-			os.remove(js_path)
+	return decode_cells(parsed)
 
-		with open(output_path, 'r') as f:
-			return json.load(f)
+def decode_cells(result):
+	# Each cell's polygon becomes a view into the shared vertex buffer
+	coords = np.frombuffer(base64.b64decode(result['coords']), dtype='<f8').reshape(-1, 2)
+	offsets = result['offsets']
+	cells = result['cells']
+	for cell, start, end in zip(cells, offsets, offsets[1:]):
+		cell['polygon'] = coords[start:end]
+	return cells
 
 def svg_to_base64(file_path):
 	with open(file_path, "rb") as image_file:
 		encoded = base64.b64encode(image_file.read()).decode('utf-8')
 	return "data:image/svg+xml;base64," + encoded
 
+def load_flags(country_flag_map, base_dir):
+	# Read and encode every available flag once, in parallel since it is I/O bound
+	paths = {}
+	for country, flag_relative in country_flag_map.items():
+		if flag_relative:
+			flag_abs_path = os.path.join(base_dir, flag_relative)
+			if os.path.exists(flag_abs_path):
+				paths[country] = flag_abs_path
+
+	def load(country):
+		try:
+			return svg_to_base64(paths[country])
+		except Exception as e:
+			print(f"Error loading flag for {country}: {str(e)}")
+
+	with ThreadPoolExecutor(max_workers=8) as executor:
+		return dict(zip(paths, executor.map(load, paths)))
+
+def polygon_centroids_areas(rings):
+	if len(rings) <= PARALLEL_THRESHOLD:
+		return shoelace_centroids_areas(rings)
+
+	# Large inputs are split into chunks handled by separate processes
+	chunks = [rings[i:i + PARALLEL_CHUNK] for i in range(0, len(rings), PARALLEL_CHUNK)]
+	with ProcessPoolExecutor() as executor:
+		results = list(executor.map(shoelace_centroids_areas, chunks))
+	centroids, areas = zip(*results)
+	return np.concatenate(centroids), np.concatenate(areas)
+
+def shoelace_centroids_areas(rings):
+	# Shoelace formula for all rings in one pass: vertices are concatenated
+	# and offsets mark where each ring starts
+	sizes = np.array([len(r) for r in rings], dtype=np.intp)
+	offsets = np.zeros(len(rings), dtype=np.intp)
+	np.cumsum(sizes[:-1], out=offsets[1:])
+	pts = np.ascontiguousarray(np.concatenate(rings), dtype=np.float64)
+	x = pts[:, 0]
+	y = pts[:, 1]
+
+	# Index of the next vertex, wrapping around within each ring
+	nxt = np.arange(1, len(pts) + 1)
+	nxt[offsets + sizes - 1] = offsets
+	x_next = x[nxt]
+	y_next = y[nxt]
+
+	cross = x * y_next - x_next * y
+	double_area = np.add.reduceat(cross, offsets)
+	cx = np.add.reduceat((x + x_next) * cross, offsets) / (3 * double_area)
+	cy = np.add.reduceat((y + y_next) * cross, offsets) / (3 * double_area)
+	return np.column_stack((cx, cy)), np.abs(double_area) / 2
+
 def plot_voronoi(polygons, df):
 	country_polygons = [p for p in polygons if p['depth'] == 2]
 	if not country_polygons:
 		print("No country polygons found!")
 		return
 
-	fig = go.Figure()
 	colors = px.colors.qualitative.G10
 	total = sum(p['value'] for p in country_polygons)
 	continents = {p['parent'] for p in country_polygons}
@@ -111,109 +170,139 @@ def plot_voronoi(polygons, df):
 
 	base_dir = os.path.dirname(os.path.abspath(__file__))
 	country_flag_map = df.set_index('Country')['Flag'].to_dict()
+	flag_cache = load_flags(country_flag_map, base_dir)
 
-	processed_polygons = []
+	# Closed rings are built once and shared by the centroid pass and the fill
+	# traces; the repeated first vertex adds nothing to the shoelace sums
+	rings = []
 	for cell in country_polygons:
-		points = [list(p) for p in cell['polygon']]
-		poly = Polygon(points)
-		centroid = poly.centroid
-		area = poly.area
+		pts = np.asarray(cell['polygon'], dtype=np.float64)
+		rings.append(np.vstack((pts, pts[:1])))
+	centroids, poly_areas = polygon_centroids_areas(rings)
+
+	# Label placement for all cells at once: peripheral labels are pulled
+	# towards the centre and font size grows with the cell area
+	cx = centroids[:, 0].copy()
+	cy = centroids[:, 1].copy()
+	distance = np.hypot(cx, cy)
+	peripheral = distance > 0.95
+	scale_factor = np.maximum(0.85, 1.0 - (distance[peripheral] - 0.9) * 1.5)
+	cx[peripheral] *= scale_factor
+	cy[peripheral] *= scale_factor
 
+	min_area = poly_areas.min()
+	max_area = poly_areas.max()
+	font_sizes = np.clip(10 + 6 * ((poly_areas - min_area) / (max_area - min_area)), 10, 16)
+	show_texts = (poly_areas >= min_area) & (distance <= 1)
+
+	processed_polygons = []
+	for i, (cell, ring) in enumerate(zip(country_polygons, rings)):
 		processed_polygons.append({
 			'cell': cell,
-			'polygon': poly,
-			'centroid': (centroid.x, centroid.y),
-			'area': area
+			'polygon': ring,
+			'label': (float(cx[i]), float(cy[i])),
+			'area': float(poly_areas[i]),
+			'font_size': float(font_sizes[i]),
+			'show_text': bool(show_texts[i])
 		})
 
-	areas = [p['area'] for p in processed_polygons]
-	min_area = min(areas) if areas else 0
-	max_area = max(areas) if areas else 1
-
+	# One fill trace per continent: cells are separated by NaN gaps.
+	# Coordinates are sent as float32 so Plotly serializes them as compact
+	# base64 typed arrays
+	traces = []
+	fills = {}
+	gap = np.array([np.nan])
 	for data in processed_polygons:
-		cell = data['cell']
-		poly = data['polygon']
-		cx, cy = data['centroid']
-		area = data['area']
-		percentage = (cell['value'] / total) * 100
+		ring = data['polygon']
+		xs, ys = fills.setdefault(data['cell']['parent'], ([], []))
+		xs.extend((ring[:, 0], gap))
+		ys.extend((ring[:, 1], gap))
 
-		x, y = poly.exterior.xy
-		x = list(x)
-		y = list(y)
-
-		distance = sqrt(cx**2 + cy**2)
-		if distance > 0.95:
-			scale_factor = 1.0 - (distance - 0.9) * 1.5
-			scale_factor = max(0.85, scale_factor)
-			cx *= scale_factor
-			cy *= scale_factor
-
-		font_size = 10 + 6 * ((area - min_area) / (max_area - min_area))
-		font_size = max(10, min(16, font_size))
-		show_text = area >= min_area and distance <= 1
-		hover_text = f"<b>{cell['name']}</b><br>{percentage:.1f}%"
-
-		fig.add_trace(go.Scatter(
-			x=x,
-			y=y,
+	for continent, (xs, ys) in fills.items():
+		traces.append(go.Scattergl(
+			x=np.asarray(np.concatenate(xs), dtype=np.float32),
+			y=np.asarray(np.concatenate(ys), dtype=np.float32),
 			fill='toself',
 			mode='lines',
 			line=dict(color='white', width=6),
-			fillcolor=color_map[cell['parent']],
-			name=hover_text,
-			hoverinfo='text',
-			hovertext=hover_text,
+			fillcolor=color_map[continent],
+			name=continent,
+			hoverinfo='skip',
 			showlegend=False
 		))
 
+	# Scattergl cannot hover on fills, so hover text comes from an invisible
+	# marker at each cell's label position
+	hover_texts = [
+		f"<b>{cell['name']}</b><br>{(cell['value'] / total) * 100:.1f}%"
+		for cell in country_polygons
+	]
+	traces.append(go.Scattergl(
+		x=np.asarray(cx, dtype=np.float32),
+		y=np.asarray(cy, dtype=np.float32),
+		customdata=hover_texts,
+		mode='markers',
+		marker=dict(opacity=0, size=40),
+		hovertemplate='%{customdata}<extra></extra>',
+		showlegend=False
+	))
+
+	# Collect labels and flags and hand them to the figure in one go
+	images = []
+	annotations = []
+	for data in processed_polygons:
+		cell = data['cell']
+		cx, cy = data['label']
+		font_size = data['font_size']
+		show_text = data['show_text']
+		percentage = (cell['value'] / total) * 100
+
 		if show_text:
-			flag_relative = country_flag_map.get(cell['name'])
-			if flag_relative:
-				flag_abs_path = os.path.join(base_dir, flag_relative)
-				if os.path.exists(flag_abs_path):
-					try:
-						base64_svg = svg_to_base64(flag_abs_path)
-						flag_size_px = 1.6 * font_size
-						data_unit_per_pixel = 2.2 / 1024
-						flag_size_data = flag_size_px * data_unit_per_pixel
-						vertical_gap = flag_size_data * 1.2 # Data units above centroid
-						horizontal_gap = flag_size_data
-
-						# Add background marker (centered with flag)
-						marker_size_data = flag_size_data * 600  # 1.6x flag size
-						fig.add_trace(go.Scatter(
-							x=[cx],
-							y=[cy + vertical_gap],
-							mode='markers',
-							marker=dict(
-								color='white',
-								size=marker_size_data,  # Scale to data units
-								sizemode='diameter'
-							),
-							showlegend=False,
-							hoverinfo='skip'
-						))
-
-						# Add flag centered at (cx, cy + vertical_gap)
-						fig.add_layout_image(
-							dict(
-								source=base64_svg,
-								xref="x",
-								yref="y",
-								x=cx,
-								y=cy + vertical_gap,
-								sizex=flag_size_data,
-								sizey=flag_size_data,
-								xanchor="center",
-								yanchor="middle",
-								layer="above"
-							)
-						)
-					except Exception as e:
-						print(f"Error loading flag for {cell['name']}: {str(e)}")
+			base64_svg = flag_cache.get(cell['name'])
+			if base64_svg:
+				flag_size_px = 1.6 * font_size
+				data_unit_per_pixel = 2.2 / 1024
+				flag_size_data = flag_size_px * data_unit_per_pixel
+				vertical_gap = flag_size_data * 1.2 # Data units above centroid
+				horizontal_gap = flag_size_data
+
+				# Add white background disc (centered with flag). It is a layout
+				# image like the flag, so it stays above the WebGL fills and
+				# below the flag, which is added after it
+				marker_size_data = flag_size_data * 600 * data_unit_per_pixel
+				images.append(
+					dict(
+						source=FLAG_BACKGROUND,
+						xref="x",
+						yref="y",
+						x=cx,
+						y=cy + vertical_gap,
+						sizex=marker_size_data,
+						sizey=marker_size_data,
+						xanchor="center",
+						yanchor="middle",
+						layer="above"
+					)
+				)
+
+				# Add flag centered at (cx, cy + vertical_gap)
+				images.append(
+					dict(
+						source=base64_svg,
+						xref="x",
+						yref="y",
+						x=cx,
+						y=cy + vertical_gap,
+						sizex=flag_size_data,
+						sizey=flag_size_data,
+						xanchor="center",
+						yanchor="middle",
+						layer="above"
+					)
+				)
 
 			# Add text as annotations (centered relative to flag)
-			fig.add_annotation(
+			annotations.append(dict(
 				x=cx,
 				y=cy,
 				text=f"<b>{cell['name']}</b>",
@@ -226,8 +315,8 @@ def plot_voronoi(polygons, df):
 				),
 				xanchor='center',
 				yanchor='middle'
-			)
-			fig.add_annotation(
+			))
+			annotations.append(dict(
 				x=cx,
 				y=cy - horizontal_gap,
 				text=f"{percentage:.1f}%",
@@ -240,9 +329,12 @@ def plot_voronoi(polygons, df):
 				),
 				xanchor='center',
 				yanchor='middle'
-			)
+			))
 
+	fig = go.Figure(data=traces)
 	fig.update_layout(
+		images=images,
+		annotations=annotations,
 		title=dict(
 			text="Global GDP Distribution (2024)",
 			x = 0.5,